@@ -5,7 +5,10 @@ from datetime import datetime, timezone
 
 import discord
 
-from ..database import save_message
+from ..commands import is_text_command
+from ..database import epoch_ms, save_message
+from ..models import MessageRow
+from ..utils import format_username
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +26,13 @@ async def store_message(message: discord.Message) -> None:
         - Channel/server information
         - Message characteristics (attachments, embeds, mentions)
         - Timestamps
+
+    Text command invocations (e.g. "start test") are skipped - they carry no
+    conversational signal and would otherwise add a write per command.
     """
+    if is_text_command(message.content):
+        return
+
     try:
         # Determine if message is a DM
         is_dm = isinstance(message.channel, discord.DMChannel)
@@ -41,28 +50,29 @@ async def store_message(message: discord.Message) -> None:
         if message.reference and message.reference.message_id:
             reply_to_message_id = str(message.reference.message_id)
 
-        # Build message data dictionary
-        message_data = {
-            "message_id": str(message.id),
-            "discord_user_id": str(message.author.id),
-            "discord_username": f"{message.author.name}#{message.author.discriminator}",
-            "message_text": message.content,
-            "channel_id": channel_id,
-            "channel_name": channel_name,
-            "server_id": server_id,
-            "server_name": server_name,
-            "is_dm": is_dm,
-            "message_length": len(message.content),
-            "has_attachments": len(message.attachments) > 0,
-            "has_embeds": len(message.embeds) > 0,
-            "has_mentions": len(message.mentions) > 0,
-            "reply_to_message_id": reply_to_message_id,
-            "created_at": message.created_at.isoformat(),
-            "edited_at": message.edited_at.isoformat() if message.edited_at else None,
-        }
+        # Build message row (field order matches the messages table)
+        row = MessageRow(
+            message_id=str(message.id),
+            discord_user_id=str(message.author.id),
+            discord_username=format_username(message.author.name, message.author.discriminator),
+            message_text=message.content,
+            channel_id=channel_id,
+            channel_name=channel_name,
+            server_id=server_id,
+            server_name=server_name,
+            is_dm=1 if is_dm else 0,
+            message_length=len(message.content),
+            has_attachments=1 if message.attachments else 0,
+            has_embeds=1 if message.embeds else 0,
+            has_mentions=1 if message.mentions else 0,
+            reply_to_message_id=reply_to_message_id,
+            created_at=message.created_at.isoformat(),
+            edited_at=message.edited_at.isoformat() if message.edited_at else None,
+            created_at_ms=epoch_ms(message.created_at),
+        )
 
         # Save to database
-        save_message(message_data)
+        save_message(row)
 
         logger.debug(
             f"Stored message {message.id} from {message.author.name} "
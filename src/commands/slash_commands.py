@@ -2,44 +2,57 @@
 
 import logging
 import os
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 
 import discord
 from discord import app_commands
 
-from ..database import get_prayers_for_week
+from ..database import aget_prayers_for_week
 from ..engagement.message_generator import EngagementMessageGenerator
+from ..utils import format_username
 
 logger = logging.getLogger(__name__)
 
+# DM channels by user ID. discord.py only keeps the 128 most recent private channels,
+# so returning users beyond that would otherwise cost a REST call in create_dm().
+DM_CHANNEL_CACHE_SIZE = 1024
+_dm_channel_cache: OrderedDict[int, discord.DMChannel] = OrderedDict()
 
-def register_slash_commands(tree: app_commands.CommandTree, context: dict) -> None:
-    """
-    Register all slash commands with the command tree.
 
-    Args:
-        tree: Discord command tree to register commands with
-        context: Shared context containing bot resources (questions, sessions, etc.)
-    """
+async def _get_dm_channel(user: discord.abc.User) -> discord.DMChannel:
+    """Get a user's DM channel, creating it only on an LRU cache miss."""
+    dm_channel = _dm_channel_cache.get(user.id)
+    if dm_channel is not None:
+        _dm_channel_cache.move_to_end(user.id)
+        return dm_channel
+
+    dm_channel = await user.create_dm()
+    _dm_channel_cache[user.id] = dm_channel
+    if len(_dm_channel_cache) > DM_CHANNEL_CACHE_SIZE:
+        _dm_channel_cache.popitem(last=False)
+    return dm_channel
+
 
-    @tree.command(name="personality", description="Take the full MBTI personality test")
-    async def personality_full(interaction: discord.Interaction) -> None:
-        """Slash command to start the full personality test in DM."""
+def _make_personality_handler(context: dict, is_dummy: bool, label: str):
+    """Build the slash command handler that starts a full or quick test in DM."""
+
+    async def handler(interaction: discord.Interaction) -> None:
         await interaction.response.defer(ephemeral=True)
 
         user_id = interaction.user.id
-        username = f"{interaction.user.name}#{interaction.user.discriminator}"
+        username = format_username(interaction.user.name, interaction.user.discriminator)
 
         try:
             # Send DM to user
-            dm_channel = await interaction.user.create_dm()
+            dm_channel = await _get_dm_channel(interaction.user)
 
             await context["start_test_func"](
-                dm_channel, user_id, username, is_dummy=False, **context["test_data"]
+                dm_channel, user_id, username, is_dummy=is_dummy, **context["test_data"]
             )
 
             await interaction.followup.send(
-                "✅ Check your DMs! I've started the personality test there.", ephemeral=True
+                f"✅ Check your DMs! I've started the {label} there.", ephemeral=True
             )
         except discord.Forbidden:
             await interaction.followup.send(
@@ -52,35 +65,24 @@ def register_slash_commands(tree: app_commands.CommandTree, context: dict) -> No
                 "❌ An error occurred while starting the test. Please try again.", ephemeral=True
             )
 
-    @tree.command(name="personality-quick", description="Take a quick 5-question personality test")
-    async def personality_quick(interaction: discord.Interaction) -> None:
-        """Slash command to start the quick personality test in DM."""
-        await interaction.response.defer(ephemeral=True)
+    return handler
 
-        user_id = interaction.user.id
-        username = f"{interaction.user.name}#{interaction.user.discriminator}"
 
-        try:
-            # Send DM to user
-            dm_channel = await interaction.user.create_dm()
+def register_slash_commands(tree: app_commands.CommandTree, context: dict) -> None:
+    """
+    Register all slash commands with the command tree.
 
-            await context["start_test_func"](
-                dm_channel, user_id, username, is_dummy=True, **context["test_data"]
-            )
+    Args:
+        tree: Discord command tree to register commands with
+        context: Shared context containing bot resources (questions, sessions, etc.)
+    """
 
-            await interaction.followup.send(
-                "✅ Check your DMs! I've started the quick test there.", ephemeral=True
-            )
-        except discord.Forbidden:
-            await interaction.followup.send(
-                "❌ I couldn't send you a DM. Please enable DMs from server members in your privacy settings.",
-                ephemeral=True,
-            )
-        except Exception as e:
-            logger.error(f"Error starting test for {username}: {e}")
-            await interaction.followup.send(
-                "❌ An error occurred while starting the test. Please try again.", ephemeral=True
-            )
+    tree.command(name="personality", description="Take the full MBTI personality test")(
+        _make_personality_handler(context, is_dummy=False, label="personality test")
+    )
+    tree.command(name="personality-quick", description="Take a quick 5-question personality test")(
+        _make_personality_handler(context, is_dummy=True, label="quick test")
+    )
 
     @tree.command(name="prayer", description="Get this week's prayer requests (Mentors only)")
     async def prayer_command(interaction: discord.Interaction) -> None:
@@ -115,7 +117,7 @@ def register_slash_commands(tree: app_commands.CommandTree, context: dict) -> No
         logger.info(f"Fetching prayers for week: {monday.date()} to {sunday.date()}")
 
         # Query database
-        prayers = get_prayers_for_week(monday, sunday)
+        prayers = await aget_prayers_for_week(monday, sunday)
 
         if not prayers or len(prayers) == 0:
             week_range = f"{monday.strftime('%b %d')}-{sunday.strftime('%d')}"
@@ -154,7 +156,7 @@ def register_slash_commands(tree: app_commands.CommandTree, context: dict) -> No
 
         # Send via DM
         try:
-            dm_channel = await interaction.user.create_dm()
+            dm_channel = await _get_dm_channel(interaction.user)
 
             for msg in messages:
                 await dm_channel.send(msg)
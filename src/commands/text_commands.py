@@ -5,11 +5,16 @@ from typing import Callable, Dict
 
 import discord
 
+from ..utils import format_username
+
 logger = logging.getLogger(__name__)
 
 # Global registry for text commands
 _text_commands: Dict[str, Callable] = {}
 
+# First characters of all triggers, so most messages are rejected without lower()/strip()
+_command_first_chars: frozenset[str] = frozenset()
+
 
 def text_command(trigger: str):
     """
@@ -22,13 +27,28 @@ def text_command(trigger: str):
     """
 
     def decorator(func: Callable):
+        global _command_first_chars
         _text_commands[trigger.lower()] = func
+        _command_first_chars = frozenset(t[0] for t in _text_commands)
         logger.info(f"Registered text command: '{trigger}'")
         return func
 
     return decorator
 
 
+def _may_be_command(content: str) -> bool:
+    """Cheap first-character check before normalizing the whole message."""
+    if not content:
+        return False
+    first = content[0]
+    return first.isspace() or first.lower() in _command_first_chars
+
+
+def is_text_command(content: str) -> bool:
+    """Check whether message content is a registered text command trigger."""
+    return _may_be_command(content) and content.lower().strip() in _text_commands
+
+
 async def handle_text_command(message: discord.Message, context: dict) -> bool:
     """
     Check if message matches any registered text command and execute it.
@@ -40,6 +60,9 @@ async def handle_text_command(message: discord.Message, context: dict) -> bool:
     Returns:
         True if a command was handled, False otherwise
     """
+    if not _may_be_command(message.content):
+        return False
+
     content = message.content.lower().strip()
 
     if content in _text_commands:
@@ -67,7 +90,7 @@ async def handle_text_command(message: discord.Message, context: dict) -> bool:
 async def handle_start_test(message: discord.Message, context: dict) -> None:
     """Start the full MBTI personality test."""
     user_id = message.author.id
-    username = f"{message.author.name}#{message.author.discriminator}"
+    username = format_username(message.author.name, message.author.discriminator)
 
     await context["start_test_func"](
         message.channel, user_id, username, is_dummy=False, **context["test_data"]
@@ -78,7 +101,7 @@ async def handle_start_test(message: discord.Message, context: dict) -> None:
 async def handle_dummy_test(message: discord.Message, context: dict) -> None:
     """Start the quick 5-question personality test."""
     user_id = message.author.id
-    username = f"{message.author.name}#{message.author.discriminator}"
+    username = format_username(message.author.name, message.author.discriminator)
 
     await context["start_test_func"](
         message.channel, user_id, username, is_dummy=True, **context["test_data"]
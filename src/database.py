@@ -1,24 +1,147 @@
 """Database operations for storing personality test results."""
 
+import asyncio
 import json
 import logging
+import math
 import os
+import queue
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
 
 import libsql
 
-from .models import PersonalityProfile, Scores
+from .models import MessageRow, PersonalityProfile, Scores, scores_to_dict
 
 logger = logging.getLogger(__name__)
 
-# Global database connection
+# Global database connection (used for schema setup and replica sync)
 db_conn: libsql.Connection | None = None
 
+# Connections available to writers/readers. Production talks to Turso over the network,
+# so a few connections let concurrent writes proceed in parallel. The development
+# embedded replica stays on a single connection (db_conn).
+PRODUCTION_POOL_SIZE = 4
+_db_pool: queue.Queue[libsql.Connection] = queue.Queue()
+
+# Whether db_conn is an embedded replica that syncs with Turso (set by init_database)
+_sync_enabled = False
+
+# Tuning for the local embedded replica file: WAL lets analytics reads run alongside
+# writes, and synchronous=NORMAL fsyncs at checkpoints instead of on every commit
+_REPLICA_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA journal_size_limit=67108864",  # Truncate the WAL back to 64 MiB after checkpoints
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MiB memory map
+)
+
+# libsql has no prepared-statement API, so every runtime statement is a module constant:
+# identical SQL text on each call lets SQLite's statement cache reuse the compiled plan
+_INSERT_TEST_RESULT_SQL = """
+    INSERT INTO test_results (
+        discord_user_id, discord_username, personality_type,
+        test_type, scores, biblical_characters, spiritual_gifts,
+        ministry_suggestions, completed_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# OR IGNORE keeps one duplicate message_id from failing a whole batch
+_INSERT_MESSAGE_SQL = """
+    INSERT OR IGNORE INTO messages (
+        message_id, discord_user_id, discord_username,
+        message_text, channel_id, channel_name,
+        server_id, server_name, is_dm, message_length,
+        has_attachments, has_embeds, has_mentions,
+        reply_to_message_id, created_at, edited_at, created_at_ms
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Ingest-time rollup so analytics over recent windows avoid scanning raw messages.
+# Aggregates messages with id above the given one, i.e. only rows a batch actually
+# inserted (INSERT OR IGNORE skips duplicates); with 0 it backfills the whole table.
+_ROLLUP_MESSAGES_HOURLY_SQL = """
+    INSERT INTO messages_hourly (
+        discord_user_id, channel_id, hour,
+        msg_count, total_length, attachment_count
+    )
+    SELECT discord_user_id, COALESCE(channel_id, ''), substr(created_at, 1, 13),
+        COUNT(*), SUM(message_length), SUM(has_attachments)
+    FROM messages
+    WHERE id > ?
+    GROUP BY 1, 2, 3
+    ON CONFLICT(discord_user_id, channel_id, hour) DO UPDATE SET
+        msg_count = msg_count + excluded.msg_count,
+        total_length = total_length + excluded.total_length,
+        attachment_count = attachment_count + excluded.attachment_count
+"""
+
+_SELECT_MAX_MESSAGE_ID_SQL = "SELECT COALESCE(MAX(id), 0) FROM messages"
+
+_INSERT_PRAYER_SQL = """
+    INSERT INTO prayers (
+        message_id, discord_user_id, discord_username,
+        channel_id, raw_message, extracted_prayer,
+        posted_at, created_at, posted_at_ms
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Served entirely from idx_prayers_posted_ts
+_SELECT_PRAYERS_IN_RANGE_SQL = """
+    SELECT id, discord_username, extracted_prayer, posted_at
+    FROM prayers
+    WHERE posted_at_ms BETWEEN ? AND ?
+    ORDER BY posted_at_ms ASC
+"""
+
+_SELECT_META_SQL = "SELECT value FROM meta WHERE key = ?"
+
+_UPSERT_META_SQL = """
+    INSERT INTO meta (key, value) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value
+"""
+
+# Blocking libsql calls run on this executor so they never stall the event loop.
+# Each call checks a connection out of _db_pool, so workers never share one.
+_db_executor = ThreadPoolExecutor(max_workers=PRODUCTION_POOL_SIZE, thread_name_prefix="libsql")
+
+# Analytics messages are buffered and written in batches
+MESSAGE_FLUSH_SIZE = 100  # Flush immediately once this many rows are waiting
+MESSAGE_FLUSH_INTERVAL = 1.0  # Otherwise flush at least this often (seconds)
+MESSAGE_BUFFER_LIMIT = 512  # Oldest rows are dropped beyond this if flushing falls behind
+
+_message_buffer: deque[MessageRow] = deque(maxlen=MESSAGE_BUFFER_LIMIT)
+_dropped_messages = 0
+_flush_event = asyncio.Event()
+
+# Completed test results are queued off the interaction path and written in small batches
+TEST_RESULT_FLUSH_DELAY = 0.05  # Seconds to wait for more results after the first arrives
+TEST_RESULT_RETRY_DELAY = 1.0  # First retry delay after a failed write, doubled per failure
+TEST_RESULT_RETRY_MAX_DELAY = 60.0
+TEST_RESULT_BATCH_ATTEMPTS = 3  # Failed batches before falling back to row-by-row inserts
+
+_test_result_buffer: deque[tuple] = deque()
+_test_result_event = asyncio.Event()
+
+# Rows fetched per round-trip when reading query results
+PRAYER_FETCH_SIZE = 100
+
+# Embedded replica changes are pushed to Turso periodically rather than per write.
+# Override with TURSO_SYNC_INTERVAL (seconds); read by init_database.
+SYNC_INTERVAL = 60.0  # seconds (development only)
+_sync_interval = SYNC_INTERVAL
+
+_background_tasks: list[asyncio.Task] = []
+
 
 def init_database() -> None:
     """Initialize Turso database connection and create tables."""
-    global db_conn
+    global db_conn, _sync_enabled, _sync_interval
 
     turso_url = os.getenv("TURSO_DATABASE_URL")
     turso_token = os.getenv("TURSO_AUTH_TOKEN")
@@ -31,11 +154,18 @@ def init_database() -> None:
         # In production, connect directly to Turso (no embedded replica in containers)
         # In development, use embedded replica with sync
         environment = os.getenv("ENVIRONMENT", "development")
+        _sync_enabled = environment == "development"
+        _sync_interval = _read_sync_interval()
 
         if environment == "production":
             # Direct connection to Turso (no local replica)
             db_conn = libsql.connect(turso_url, auth_token=turso_token)
-            logger.info("Connected directly to Turso database (production)")
+            for _ in range(PRODUCTION_POOL_SIZE - 1):
+                _db_pool.put(libsql.connect(turso_url, auth_token=turso_token))
+            logger.info(
+                f"Connected directly to Turso database (production, "
+                f"{PRODUCTION_POOL_SIZE} connections)"
+            )
         else:
             # Connect to Turso with embedded replica (development)
             db_conn = libsql.connect(
@@ -43,10 +173,15 @@ def init_database() -> None:
             )
             logger.info("Connected to Turso database with embedded replica (development)")
 
+            _configure_pragmas(db_conn)
+
             # Sync on startup to pull latest data from Turso
             db_conn.sync()
             logger.info("Synced with remote Turso database")
 
+        # Apply all schema changes in one transaction (one commit, no partial schema)
+        db_conn.execute("BEGIN")
+
         # Create test_results table if not exists
         db_conn.execute(
             """
@@ -85,18 +220,23 @@ def init_database() -> None:
                 has_mentions INTEGER NOT NULL,
                 reply_to_message_id TEXT,
                 created_at TEXT NOT NULL,
-                edited_at TEXT
+                edited_at TEXT,
+                created_at_ms INTEGER
             )
         """
         )
+        _add_epoch_ms_column("messages", "created_at")
 
         # Create indexes for common queries
+        # Composite index serves per-user lookups and per-user time windows
         db_conn.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_messages_user
-            ON messages(discord_user_id)
+            CREATE INDEX IF NOT EXISTS idx_messages_user_ts
+            ON messages(discord_user_id, created_at_ms)
         """
         )
+        db_conn.execute("DROP INDEX IF EXISTS idx_messages_user")
+        db_conn.execute("DROP INDEX IF EXISTS idx_messages_user_time")
         db_conn.execute(
             """
             CREATE INDEX IF NOT EXISTS idx_messages_channel
@@ -105,10 +245,33 @@ def init_database() -> None:
         )
         db_conn.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_messages_created
-            ON messages(created_at)
+            CREATE INDEX IF NOT EXISTS idx_messages_created_ts
+            ON messages(created_at_ms)
         """
         )
+        db_conn.execute("DROP INDEX IF EXISTS idx_messages_created")
+
+        # Create hourly message rollup for analytics (hour is "YYYY-MM-DDTHH" UTC)
+        rollup_exists = db_conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_hourly'"
+        ).fetchone()
+        db_conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS messages_hourly (
+                discord_user_id TEXT NOT NULL,
+                channel_id TEXT NOT NULL,
+                hour TEXT NOT NULL,
+                msg_count INTEGER NOT NULL,
+                total_length INTEGER NOT NULL,
+                attachment_count INTEGER NOT NULL,
+                PRIMARY KEY (discord_user_id, channel_id, hour)
+            )
+        """
+        )
+        if not rollup_exists:
+            # Backfill once from messages stored before the rollup existed
+            db_conn.execute(_ROLLUP_MESSAGES_HOURLY_SQL, (0,))
+            logger.info("Backfilled messages_hourly from existing messages")
 
         # Create prayers table for prayer management
         db_conn.execute(
@@ -122,18 +285,23 @@ def init_database() -> None:
                 raw_message TEXT NOT NULL,
                 extracted_prayer TEXT NOT NULL,
                 posted_at TEXT NOT NULL,
-                created_at TEXT NOT NULL
+                created_at TEXT NOT NULL,
+                posted_at_ms INTEGER
             )
         """
         )
+        _add_epoch_ms_column("prayers", "posted_at")
 
         # Create indexes for prayers table
+        # Covering index for the weekly prayer query (id is the implicit rowid)
         db_conn.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_prayers_posted_at
-            ON prayers(posted_at)
+            CREATE INDEX IF NOT EXISTS idx_prayers_posted_ts
+            ON prayers(posted_at_ms, discord_username, extracted_prayer, posted_at)
         """
         )
+        db_conn.execute("DROP INDEX IF EXISTS idx_prayers_posted_at")
+        db_conn.execute("DROP INDEX IF EXISTS idx_prayers_covering")
         db_conn.execute(
             """
             CREATE INDEX IF NOT EXISTS idx_prayers_user_id
@@ -141,18 +309,115 @@ def init_database() -> None:
         """
         )
 
+        # Create meta table for small key/value bot state
+        db_conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """
+        )
+
         db_conn.commit()
 
         # Only sync in development (with embedded replica)
-        if environment == "development":
+        if _sync_enabled:
             db_conn.sync()
 
+        _db_pool.put(db_conn)
         logger.info("Database schema initialized")
 
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
+        if db_conn is not None:
+            _rollback(db_conn)
         sys.exit(1)
 
+    # Start background flushing of buffered messages and periodic replica sync
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.warning("No running event loop - buffered messages are flushed on close only")
+        return
+
+    _background_tasks.append(loop.create_task(_message_flush_loop()))
+    _background_tasks.append(loop.create_task(_test_result_writer_loop()))
+    if _sync_enabled:
+        _background_tasks.append(loop.create_task(_periodic_sync_loop()))
+
+
+def _read_sync_interval() -> float:
+    """Read TURSO_SYNC_INTERVAL, falling back to SYNC_INTERVAL if unset or invalid."""
+    value = os.getenv("TURSO_SYNC_INTERVAL")
+    if not value:
+        return SYNC_INTERVAL
+
+    try:
+        interval = float(value)
+    except ValueError:
+        interval = 0.0
+    # float() accepts "nan" and "inf", which would crash or disable the sync loop
+    if not math.isfinite(interval) or interval <= 0:
+        logger.warning(f"Invalid TURSO_SYNC_INTERVAL '{value}', using {SYNC_INTERVAL}s")
+        return SYNC_INTERVAL
+    return interval
+
+
+def _add_epoch_ms_column(table: str, iso_column: str) -> None:
+    """
+    Add an INTEGER epoch-milliseconds twin of an ISO timestamp column.
+
+    Tables created before the column existed get it via ALTER TABLE, and existing
+    rows are backfilled from the ISO text. The ISO column is kept for readability.
+    """
+    ms_column = f"{iso_column}_ms"
+    columns = [row[1] for row in db_conn.execute(f"PRAGMA table_info({table})").fetchall()]
+    if ms_column in columns:
+        return
+
+    db_conn.execute(f"ALTER TABLE {table} ADD COLUMN {ms_column} INTEGER")
+    db_conn.execute(
+        f"""
+        UPDATE {table}
+        SET {ms_column} = CAST(ROUND((julianday({iso_column}) - 2440587.5) * 86400000) AS INTEGER)
+        WHERE {ms_column} IS NULL
+    """
+    )
+    logger.info(f"Added {table}.{ms_column} and backfilled existing rows")
+
+
+def epoch_ms(timestamp: datetime) -> int:
+    """Convert a timezone-aware datetime to integer milliseconds since the epoch."""
+    return int(timestamp.timestamp() * 1000)
+
+
+@contextmanager
+def _connection():
+    """Check a connection out of the pool, blocking until one is free."""
+    conn = _db_pool.get()
+    try:
+        yield conn
+    finally:
+        _db_pool.put(conn)
+
+
+def _configure_pragmas(conn: libsql.Connection) -> None:
+    """Apply replica tuning pragmas, warning instead of failing if one is rejected."""
+    for pragma in _REPLICA_PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except Exception as e:
+            logger.warning(f"Could not apply '{pragma}': {e}")
+
+    # journal_mode silently keeps the old mode if WAL is unavailable, so check the result
+    try:
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if mode.lower() != "wal":
+            logger.warning(f"Replica journal_mode is '{mode}', not WAL")
+    except Exception as e:
+        logger.warning(f"Could not read journal_mode: {e}")
+
 
 def save_test_result(
     user_id: int,
@@ -163,91 +428,296 @@ def save_test_result(
     profile: PersonalityProfile,
 ) -> None:
     """Save test result to database."""
+    row = _test_result_row(user_id, username, personality_type, test_type, scores, profile)
+
+    if save_test_results_bulk([row]):
+        logger.info(f"Saved test result for {username} ({user_id}): {personality_type}")
+
+
+def queue_test_result(
+    user_id: int,
+    username: str,
+    personality_type: str,
+    test_type: str,
+    scores: Scores,
+    profile: PersonalityProfile,
+) -> None:
+    """
+    Queue a test result to be written by the background writer task.
+
+    Returns immediately so the caller can reply to the user without waiting on
+    database I/O. Results arriving within ``TEST_RESULT_FLUSH_DELAY`` of each
+    other are saved in one transaction.
+    """
+    _test_result_buffer.append(
+        _test_result_row(user_id, username, personality_type, test_type, scores, profile)
+    )
+    _test_result_event.set()
+
+
+def _test_result_row(
+    user_id: int,
+    username: str,
+    personality_type: str,
+    test_type: str,
+    scores: Scores,
+    profile: PersonalityProfile,
+) -> tuple:
+    """Build a test_results row in INSERT column order."""
+    return (
+        str(user_id),
+        username,
+        personality_type,
+        test_type,
+        json.dumps(scores_to_dict(scores)),
+        json.dumps(profile.biblical_characters),
+        json.dumps(profile.spiritual_gifts),
+        json.dumps(profile.ministry_suggestions),
+        datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def save_test_results_bulk(rows: list[tuple]) -> bool:
+    """
+    Save many test results with one executemany() and a single commit.
+
+    Args:
+        rows: Tuples in test_results INSERT column order (e.g. from a backfill or import)
+
+    Returns:
+        True if the rows were saved, False otherwise
+    """
     if db_conn is None:
         logger.error("Database not initialized")
-        return
+        return False
 
-    try:
-        db_conn.execute(
-            """
-            INSERT INTO test_results (
-                discord_user_id, discord_username, personality_type,
-                test_type, scores, biblical_characters, spiritual_gifts,
-                ministry_suggestions, completed_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            [
-                str(user_id),
-                username,
-                personality_type,
-                test_type,
-                json.dumps(scores),
-                json.dumps(profile.biblical_characters),
-                json.dumps(profile.spiritual_gifts),
-                json.dumps(profile.ministry_suggestions),
-                datetime.now(timezone.utc).isoformat(),
-            ],
-        )
-        db_conn.commit()
+    with _connection() as conn:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(_INSERT_TEST_RESULT_SQL, rows)
+            conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save {len(rows)} test result(s): {e}")
+            _rollback(conn)
+            return False
 
-        # Only sync in development
-        if os.getenv("ENVIRONMENT", "development") == "development":
-            db_conn.sync()
 
-        logger.info(f"Saved test result for {username} ({user_id}): {personality_type}")
-    except Exception as e:
-        logger.error(f"Failed to save test result: {e}")
+def _flush_test_result_buffer(row_by_row: bool = False) -> bool:
+    """
+    Write all queued test results, in a single transaction unless ``row_by_row`` is set.
 
+    Rows that fail are put back at the front of the queue for a later retry. Writing
+    row by row isolates a bad row so it cannot keep the rest of the queue from saving.
 
-def save_message(message_data: dict) -> None:
+    Returns:
+        True if the queue was fully written, False if any rows remain
     """
-    Save message to database for analytics.
+    if db_conn is None:
+        return False
+    if not _test_result_buffer:
+        return True
+
+    rows = [_test_result_buffer.popleft() for _ in range(len(_test_result_buffer))]
+
+    saved: list[tuple] = []
+    failed: list[tuple] = []
+    if row_by_row:
+        for row in rows:
+            (saved if save_test_results_bulk([row]) else failed).append(row)
+    elif save_test_results_bulk(rows):
+        saved = rows
+    else:
+        failed = rows
+
+    for row in saved:
+        logger.info(f"Saved test result for {row[1]} ({row[0]}): {row[2]}")
+
+    if failed:
+        _test_result_buffer.extendleft(reversed(failed))
+        logger.warning(f"Re-queued {len(failed)} test result(s) for retry")
+        return False
+    return True
+
+
+def save_message(row: MessageRow) -> None:
+    """
+    Queue a message for batched insertion into the analytics table.
+
+    Rows are written by the background flush task every ``MESSAGE_FLUSH_INTERVAL``
+    seconds, or as soon as ``MESSAGE_FLUSH_SIZE`` rows are waiting. The buffer holds at
+    most ``MESSAGE_BUFFER_LIMIT`` rows; if the database stalls, the oldest are dropped.
 
     Args:
-        message_data: Dictionary containing message fields matching the schema
+        row: Message fields in the messages table column order
+    """
+    global _dropped_messages
+    if len(_message_buffer) == MESSAGE_BUFFER_LIMIT:
+        _dropped_messages += 1
+    _message_buffer.append(row)
+
+    if len(_message_buffer) >= MESSAGE_FLUSH_SIZE:
+        _flush_event.set()
+
+
+def _flush_message_buffer() -> list[MessageRow]:
+    """
+    Write all buffered messages to the database with a single executemany().
+
+    Returns:
+        The rows that could not be written (empty on success), for the caller to re-queue
+    """
+    if db_conn is None or not _message_buffer:
+        return []
+
+    rows = [_message_buffer.popleft() for _ in range(len(_message_buffer))]
+
+    with _connection() as conn:
+        try:
+            # One explicit transaction for the whole batch instead of per-statement autocommit
+            conn.execute("BEGIN IMMEDIATE")
+            last_id = conn.execute(_SELECT_MAX_MESSAGE_ID_SQL).fetchone()[0]
+            conn.executemany(_INSERT_MESSAGE_SQL, rows)
+            # The write lock is held, so ids above last_id are exactly this batch's inserts
+            conn.execute(_ROLLUP_MESSAGES_HOURLY_SQL, (last_id,))
+            conn.commit()
+
+            logger.debug(f"Flushed {len(rows)} messages to database")
+            return []
+        except Exception as e:
+            logger.error(f"Failed to save {len(rows)} messages: {e}")
+            _rollback(conn)
+            return rows
+
+
+def _requeue_messages(rows: list[MessageRow]) -> None:
+    """
+    Put unwritten rows back at the front of the buffer for the next flush.
+
+    If that would exceed ``MESSAGE_BUFFER_LIMIT``, the oldest rows are dropped and
+    counted in the dropped-message warning. Must run on the event loop thread.
+    """
+    global _dropped_messages
+    overflow = len(_message_buffer) + len(rows) - MESSAGE_BUFFER_LIMIT
+    if overflow > 0:
+        _dropped_messages += overflow
+        rows = rows[overflow:]
+    _message_buffer.extendleft(reversed(rows))
+
+
+def _rollback(conn: libsql.Connection) -> None:
+    """Roll back an open transaction, ignoring errors if none is active."""
+    try:
+        conn.rollback()
+    except Exception:
+        pass
+
+
+def _report_dropped_messages() -> None:
+    """
+    Log and reset the count of messages dropped from a full buffer.
+
+    Must run on the event loop thread, where save_message() increments the count.
     """
+    global _dropped_messages
+    if _dropped_messages:
+        logger.warning(f"Message buffer full, dropped {_dropped_messages} analytics messages")
+        _dropped_messages = 0
+
+
+async def _message_flush_loop() -> None:
+    """Flush the message buffer on a timer, or early when it fills up."""
+    while True:
+        try:
+            await asyncio.wait_for(_flush_event.wait(), timeout=MESSAGE_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _flush_event.clear()
+
+        _report_dropped_messages()
+        _requeue_messages(await _run_in_executor(_flush_message_buffer))
+
+
+async def _test_result_writer_loop() -> None:
+    """Write queued test results shortly after they arrive, retrying failures with backoff."""
+    loop = asyncio.get_running_loop()
+    failures = 0
+    while True:
+        await _test_result_event.wait()
+        # Give concurrent completions a moment to join the same batch
+        await asyncio.sleep(TEST_RESULT_FLUSH_DELAY)
+        _test_result_event.clear()
+
+        row_by_row = failures >= TEST_RESULT_BATCH_ATTEMPTS
+        if await _run_in_executor(_flush_test_result_buffer, row_by_row):
+            failures = 0
+            continue
+
+        failures += 1
+        delay = min(TEST_RESULT_RETRY_DELAY * 2 ** (failures - 1), TEST_RESULT_RETRY_MAX_DELAY)
+        logger.warning(f"Retrying test result write in {delay:g}s (attempt {failures + 1})")
+        loop.call_later(delay, _test_result_event.set)
+
+
+async def _periodic_sync_loop() -> None:
+    """Push local replica changes to Turso every ``TURSO_SYNC_INTERVAL`` seconds."""
+    while True:
+        await asyncio.sleep(_sync_interval)
+        try:
+            await _run_in_executor(_sync_replica)
+        except Exception as e:
+            logger.error(f"Failed to sync with remote Turso database: {e}")
+
+
+def _sync_replica() -> None:
+    """Sync the embedded replica, holding its connection so no write runs concurrently."""
+    with _connection() as conn:
+        conn.sync()
+
+
+async def _run_in_executor(func, *args):
+    """Run a blocking database function on the database executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, func, *args)
+
+
+def get_meta(key: str) -> str | None:
+    """Read a value from the meta table, or None if it is unset or unreadable."""
     if db_conn is None:
         logger.error("Database not initialized")
-        return
+        return None
 
     try:
-        db_conn.execute(
-            """
-            INSERT INTO messages (
-                message_id, discord_user_id, discord_username,
-                message_text, channel_id, channel_name,
-                server_id, server_name, is_dm, message_length,
-                has_attachments, has_embeds, has_mentions,
-                reply_to_message_id, created_at, edited_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            [
-                message_data["message_id"],
-                message_data["discord_user_id"],
-                message_data["discord_username"],
-                message_data["message_text"],
-                message_data["channel_id"],
-                message_data["channel_name"],
-                message_data["server_id"],
-                message_data["server_name"],
-                1 if message_data["is_dm"] else 0,
-                message_data["message_length"],
-                1 if message_data["has_attachments"] else 0,
-                1 if message_data["has_embeds"] else 0,
-                1 if message_data["has_mentions"] else 0,
-                message_data["reply_to_message_id"],
-                message_data["created_at"],
-                message_data["edited_at"],
-            ],
-        )
-        db_conn.commit()
+        with _connection() as conn:
+            row = conn.execute(_SELECT_META_SQL, (key,)).fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        logger.error(f"Failed to read meta '{key}': {e}")
+        return None
 
-        # Only sync in development
-        if os.getenv("ENVIRONMENT", "development") == "development":
-            db_conn.sync()
 
+def set_meta(key: str, value: str) -> None:
+    """Insert or replace a value in the meta table."""
+    if db_conn is None:
+        logger.error("Database not initialized")
+        return
+
+    try:
+        with _connection() as conn:
+            conn.execute(_UPSERT_META_SQL, (key, value))
+            conn.commit()
     except Exception as e:
-        logger.error(f"Failed to save message: {e}")
+        logger.error(f"Failed to write meta '{key}': {e}")
+
+
+async def aget_meta(key: str) -> str | None:
+    """Read a meta value without blocking the event loop."""
+    return await _run_in_executor(get_meta, key)
+
+
+async def aset_meta(key: str, value: str) -> None:
+    """Write a meta value without blocking the event loop."""
+    await _run_in_executor(set_meta, key, value)
 
 
 def save_prayer(prayer_data: dict) -> None:
@@ -262,30 +732,22 @@ def save_prayer(prayer_data: dict) -> None:
         return
 
     try:
-        db_conn.execute(
-            """
-            INSERT INTO prayers (
-                message_id, discord_user_id, discord_username,
-                channel_id, raw_message, extracted_prayer,
-                posted_at, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            [
-                prayer_data["message_id"],
-                prayer_data["discord_user_id"],
-                prayer_data["discord_username"],
-                prayer_data["channel_id"],
-                prayer_data["raw_message"],
-                prayer_data["extracted_prayer"],
-                prayer_data["posted_at"],
-                prayer_data["created_at"],
-            ],
-        )
-        db_conn.commit()
-
-        # Only sync in development
-        if os.getenv("ENVIRONMENT", "development") == "development":
-            db_conn.sync()
+        with _connection() as conn:
+            conn.execute(
+                _INSERT_PRAYER_SQL,
+                (
+                    prayer_data["message_id"],
+                    prayer_data["discord_user_id"],
+                    prayer_data["discord_username"],
+                    prayer_data["channel_id"],
+                    prayer_data["raw_message"],
+                    prayer_data["extracted_prayer"],
+                    prayer_data["posted_at"],
+                    prayer_data["created_at"],
+                    prayer_data["posted_at_ms"],
+                ),
+            )
+            conn.commit()
 
         logger.info(
             f"Saved prayer from {prayer_data['discord_username']}: "
@@ -295,9 +757,14 @@ def save_prayer(prayer_data: dict) -> None:
         logger.error(f"Failed to save prayer: {e}")
 
 
+async def asave_prayer(prayer_data: dict) -> None:
+    """Save prayer to database without blocking the event loop."""
+    await _run_in_executor(save_prayer, prayer_data)
+
+
 def get_prayers_for_week(start_date: datetime, end_date: datetime) -> list[dict]:
     """
-    Get all prayers posted within a date range.
+    Get all prayers posted within a date range, oldest first.
 
     Args:
         start_date: Start of date range (inclusive)
@@ -311,27 +778,22 @@ def get_prayers_for_week(start_date: datetime, end_date: datetime) -> list[dict]
         return []
 
     try:
-        cursor = db_conn.execute(
-            """
-            SELECT id, discord_username, extracted_prayer, posted_at
-            FROM prayers
-            WHERE posted_at BETWEEN ? AND ?
-            ORDER BY posted_at ASC
-            """,
-            [start_date.isoformat(), end_date.isoformat()],
-        )
-
-        rows = cursor.fetchall()
         prayers = []
-        for row in rows:
-            prayers.append(
-                {
-                    "id": row[0],
-                    "discord_username": row[1],
-                    "extracted_prayer": row[2],
-                    "posted_at": row[3],
-                }
+        # Build the dicts while holding the connection so it goes straight back to the pool
+        with _connection() as conn:
+            cursor = conn.execute(
+                _SELECT_PRAYERS_IN_RANGE_SQL, (epoch_ms(start_date), epoch_ms(end_date))
             )
+            while rows := cursor.fetchmany(PRAYER_FETCH_SIZE):
+                for row in rows:
+                    prayers.append(
+                        {
+                            "id": row[0],
+                            "discord_username": row[1],
+                            "extracted_prayer": row[2],
+                            "posted_at": row[3],
+                        }
+                    )
 
         logger.info(
             f"Retrieved {len(prayers)} prayers for week {start_date.date()} to {end_date.date()}"
@@ -343,9 +805,36 @@ def get_prayers_for_week(start_date: datetime, end_date: datetime) -> list[dict]
         return []
 
 
+async def aget_prayers_for_week(start_date: datetime, end_date: datetime) -> list[dict]:
+    """Get prayers posted within a date range without blocking the event loop."""
+    return await _run_in_executor(get_prayers_for_week, start_date, end_date)
+
+
 def close_database() -> None:
-    """Close database connection."""
+    """Flush buffered writes and close all database connections."""
     global db_conn
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+
+    # Let any in-flight writes finish before the final flush
+    _db_executor.shutdown(wait=True)
+
     if db_conn:
-        db_conn.close()
+        # Last chance for queued results: fall back to row by row if the batch fails
+        if not _flush_test_result_buffer() and not _flush_test_result_buffer(row_by_row=True):
+            logger.error(f"Could not save {len(_test_result_buffer)} test result(s) on shutdown")
+        _report_dropped_messages()
+        if unsaved := _flush_message_buffer():
+            logger.error(f"Could not save {len(unsaved)} analytics messages on shutdown")
+
+        # Push any writes since the last periodic sync
+        if _sync_enabled:
+            try:
+                db_conn.sync()
+            except Exception as e:
+                logger.error(f"Failed to sync with remote Turso database: {e}")
+
+        while not _db_pool.empty():
+            _db_pool.get_nowait().close()
         logger.info("Database connection closed")
@@ -1,5 +1,7 @@
 """Discord bot with personality test using buttons and Turso database."""
 
+import hashlib
+import json
 import logging
 import os
 import ssl
@@ -12,10 +14,18 @@ from dotenv import load_dotenv
 
 from .analytics import store_message
 from .commands import handle_text_command, register_slash_commands
-from .database import init_database, close_database, save_prayer
+from .database import (
+    init_database,
+    close_database,
+    asave_prayer,
+    aget_meta,
+    aset_meta,
+    epoch_ms,
+)
 from .models import UserSession
 from .personality import load_questions, load_profiles, get_dummy_questions, QuestionView
 from .prayer_extraction import init_xai_client, extract_prayer
+from .utils import format_username
 
 # Configure logging
 logging.basicConfig(
@@ -29,22 +39,38 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Message analytics can be switched off with ANALYTICS=0
+ANALYTICS_ENABLED = os.getenv("ANALYTICS", "1") != "0"
+
 # Store user sessions: {user_id: UserSession}
 user_sessions: dict[int, UserSession] = {}
 
 
-def create_ssl_connector() -> aiohttp.TCPConnector | None:
-    """Create SSL connector for Discord client (macOS compatibility)."""
+def create_ssl_connector() -> aiohttp.TCPConnector:
+    """Create pooled SSL connector for Discord client (macOS compatibility)."""
     try:
         import certifi
 
         ssl_context = ssl.create_default_context(cafile=certifi.where())
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
         logger.info("Using certifi SSL certificates")
-        return connector
     except ImportError:
         logger.warning("certifi not available, using system SSL certificates")
-        return None
+        ssl_context = ssl.create_default_context()
+
+    # Keep connections to Discord alive so REST calls reuse them instead of
+    # paying a new TLS handshake. discord.py's HTTP session owns and closes it.
+    return aiohttp.TCPConnector(
+        ssl=ssl_context,
+        limit=100,
+        limit_per_host=30,
+        keepalive_timeout=60,
+    )
+
+
+def command_schema_hash(tree: app_commands.CommandTree) -> str:
+    """Hash the registered global slash command payloads sent by tree.sync()."""
+    payload = [command.to_dict(tree) for command in tree.get_commands()]
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode()).hexdigest()
 
 
 async def start_test(
@@ -58,68 +84,68 @@ async def start_test(
     sessions: dict[int, UserSession],
 ) -> None:
     """Start a personality test for a user."""
-    logger.info(f"⚡ start_test() called for {username} (user_id: {user_id}, is_dummy: {is_dummy})")
+    logger.info(
+        "⚡ start_test() called for %s (user_id: %s, is_dummy: %s)", username, user_id, is_dummy
+    )
+
+    questions = dummy_questions if is_dummy else all_questions
 
-    # Check if user already has an active session
-    if user_id in sessions:
-        logger.warning(f"User {username} already has an active session!")
+    # Register a new session unless the user already has an active one
+    session = UserSession(is_dummy=is_dummy, questions=questions)
+    if sessions.setdefault(user_id, session) is not session:
+        logger.warning("User %s already has an active session!", username)
         await channel.send("⚠️ You already have an active test! Please complete it first.")
         return
 
-    questions = dummy_questions if is_dummy else all_questions
     test_name = "Quick Dummy Test" if is_dummy else "Full Personality Test"
-
-    logger.info(f"Starting {'DUMMY' if is_dummy else 'FULL'} test for {username}")
-
-    # Initialize session
-    session = UserSession(is_dummy=is_dummy, questions=questions)
-    sessions[user_id] = session
+    logger.info("Starting %s test for %s", "DUMMY" if is_dummy else "FULL", username)
 
     # Get first question
     question = questions[0]
-    options_text = "\n".join([f"{chr(65+i)}) {opt.text}" for i, opt in enumerate(question.options)])
-
     view = QuestionView(question, session, questions, profiles, user_id, username, sessions)
 
     header = f"**{test_name} Started!**"
     if is_dummy:
         header += " (5 questions)"
 
-    logger.info(f"📤 Sending initial question to channel...")
+    logger.info("📤 Sending initial question to channel...")
     message = await channel.send(
-        f"{header}\n\n" f"Question 1/{len(questions)}: {question.text}\n\n" f"{options_text}",
+        f"{header}\n\n"
+        f"Question 1/{len(questions)}: {question.text}\n\n"
+        f"{question.options_text}",
         view=view,
     )
-    logger.info(f"✅ Message sent successfully (ID: {message.id})")
+    logger.info("✅ Message sent successfully (ID: %s)", message.id)
 
 
 async def handle_prayer_message(message: discord.Message) -> None:
     """Handle messages in the prayer-wall channel."""
     from datetime import datetime, timezone
 
-    logger.info(f"Processing potential prayer from {message.author.name}")
+    logger.info("Processing potential prayer from %s", message.author.name)
 
     # Extract prayer using xAI
     extracted = extract_prayer(message.content)
 
     if extracted is None:
-        logger.debug(f"No prayer extracted from message {message.id}")
+        logger.debug("No prayer extracted from message %s", message.id)
         return
 
     # Build prayer data
     prayer_data = {
         "message_id": str(message.id),
         "discord_user_id": str(message.author.id),
-        "discord_username": f"{message.author.name}#{message.author.discriminator}",
+        "discord_username": format_username(message.author.name, message.author.discriminator),
         "channel_id": str(message.channel.id),
         "raw_message": message.content,
         "extracted_prayer": extracted,
         "posted_at": message.created_at.isoformat(),
         "created_at": datetime.now(timezone.utc).isoformat(),
+        "posted_at_ms": epoch_ms(message.created_at),
     }
 
     # Save to database
-    save_prayer(prayer_data)
+    await asave_prayer(prayer_data)
 
 
 async def async_main() -> None:
@@ -140,10 +166,10 @@ async def async_main() -> None:
         all_questions = load_questions()
         profiles = load_profiles()
         dummy_questions = get_dummy_questions(all_questions)
-        logger.info(f"Loaded {len(all_questions)} questions and {len(profiles)} profiles")
-        logger.info(f"Dummy test has {len(dummy_questions)} questions")
+        logger.info("Loaded %d questions and %d profiles", len(all_questions), len(profiles))
+        logger.info("Dummy test has %d questions", len(dummy_questions))
     except Exception as e:
-        logger.error(f"Failed to load questions or profiles: {e}")
+        logger.error("Failed to load questions or profiles: %s", e)
         sys.exit(1)
 
     # Create SSL connector
@@ -174,8 +200,16 @@ async def async_main() -> None:
     @bot.event
     async def on_ready() -> None:
         """Called when the bot is ready."""
-        await tree.sync()
-        logger.info(f"Logged in as {bot.user} (ID: {bot.user.id})")
+        # Only push slash commands to Discord when their definitions changed
+        meta_key = f"cmd_schema_hash:{bot.application_id}"
+        schema_hash = command_schema_hash(tree)
+        if await aget_meta(meta_key) == schema_hash:
+            logger.info("Slash commands unchanged, skipping sync")
+        else:
+            await tree.sync()
+            await aset_meta(meta_key, schema_hash)
+            logger.info("Slash commands synced")
+        logger.info("Logged in as %s (ID: %s)", bot.user, bot.user.id)
         logger.info("Bot is ready!")
         logger.warning(
             "⚠️ If you see this message multiple times, you have multiple bot instances running!"
@@ -192,8 +226,9 @@ async def async_main() -> None:
         if message.author.bot:
             return
 
-        # Store message for analytics
-        await store_message(message)
+        # Store message for analytics (only buffers the row; the write happens in the background)
+        if ANALYTICS_ENABLED:
+            await store_message(message)
 
         # Handle prayers from prayer-wall channel
         if (
@@ -207,13 +242,27 @@ async def async_main() -> None:
         await handle_text_command(message, command_context)
 
     logger.info("Starting Discord bot with button support and database storage...")
-    await bot.start(bot_token)
+    try:
+        await bot.start(bot_token)
+    finally:
+        # Close the gateway and HTTP session (and its connector) before the database
+        if not bot.is_closed():
+            await bot.close()
 
 
 def main() -> None:
     """Main entry point."""
     import asyncio
 
+    # uvloop is a faster drop-in event loop (not available on Windows)
+    try:
+        import uvloop
+
+        uvloop.install()
+        logger.info("Using uvloop event loop")
+    except ImportError:
+        logger.info("uvloop not available, using default asyncio event loop")
+
     try:
         asyncio.run(async_main())
     except KeyboardInterrupt:
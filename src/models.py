@@ -1,14 +1,33 @@
 """Data models for the personality test bot."""
 
+import array
+import string
 from dataclasses import dataclass, field
-from typing import TypeAlias
+from typing import NamedTuple, TypeAlias
 
 # Type aliases for clarity
-Scores: TypeAlias = dict[str, int]
+Scores: TypeAlias = array.array  # 8 ints indexed by SCORE_LETTERS position
 OptionsList: TypeAlias = list[dict[str, str | int]]
 
+# Score slot order: each MBTI pair is (first letter, second letter) at (2k, 2k + 1)
+SCORE_LETTERS = ("E", "I", "S", "N", "T", "F", "J", "P")
+LETTER_IDX = {letter: i for i, letter in enumerate(SCORE_LETTERS)}
 
-@dataclass
+# Answer option labels (A, B, C, ... Z)
+LETTERS = tuple(string.ascii_uppercase)
+
+
+def new_scores() -> Scores:
+    """Create a zeroed score array for a new session."""
+    return array.array("i", [0] * len(SCORE_LETTERS))
+
+
+def scores_to_dict(scores: Scores) -> dict[str, int]:
+    """Convert a score array to a {letter: score} dict (the stored JSON format)."""
+    return dict(zip(SCORE_LETTERS, scores))
+
+
+@dataclass(slots=True)
 class QuestionOption:
     """A single answer option for a question."""
 
@@ -16,13 +35,40 @@ class QuestionOption:
     weight: int
 
 
-@dataclass
+class OptionRecord(NamedTuple):
+    """An answer option resolved at load time to the score slot it feeds."""
+
+    letter: str  # Button label, e.g. "A"
+    score_idx: int  # Index into the session's Scores array
+    abs_weight: int  # Amount added to that slot when chosen
+
+
+@dataclass(slots=True)
 class Question:
     """A personality test question."""
 
     text: str
     dimension: str  # EI, SN, TF, or JP
     options: list[QuestionOption]
+    options_text: str = field(init=False)  # Pre-rendered "A) ...\nB) ..." option list
+    option_records: tuple[OptionRecord, ...] = field(init=False)  # Same order as options
+
+    def __post_init__(self) -> None:
+        """Pre-compute the rendered option list and per-option scoring."""
+        self.options_text = "\n".join(
+            f"{LETTERS[i]}) {option.text}" for i, option in enumerate(self.options)
+        )
+
+        # Positive weight scores the first letter (E, S, T, J), otherwise the second (I, N, F, P)
+        pos_idx, neg_idx = LETTER_IDX[self.dimension[0]], LETTER_IDX[self.dimension[1]]
+        self.option_records = tuple(
+            OptionRecord(
+                letter=LETTERS[i],
+                score_idx=pos_idx if option.weight > 0 else neg_idx,
+                abs_weight=abs(option.weight),
+            )
+            for i, option in enumerate(self.options)
+        )
 
     @classmethod
     def from_dict(cls, data: dict) -> "Question":
@@ -33,7 +79,7 @@ class Question:
         return cls(text=data["text"], dimension=data["dimension"], options=options)
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonalityProfile:
     """MBTI personality profile with biblical context."""
 
@@ -53,14 +99,34 @@ class PersonalityProfile:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class UserSession:
     """Tracks a user's test progress."""
 
     current_question: int = 0
     answers: list[str] = field(default_factory=list)
-    scores: Scores = field(
-        default_factory=lambda: {"E": 0, "I": 0, "S": 0, "N": 0, "T": 0, "F": 0, "J": 0, "P": 0}
-    )
+    scores: Scores = field(default_factory=new_scores)
     is_dummy: bool = False
     questions: list[Question] = field(default_factory=list)
+
+
+class MessageRow(NamedTuple):
+    """A row for the messages analytics table, in INSERT column order."""
+
+    message_id: str
+    discord_user_id: str
+    discord_username: str
+    message_text: str
+    channel_id: str
+    channel_name: str
+    server_id: str | None
+    server_name: str | None
+    is_dm: int
+    message_length: int
+    has_attachments: int
+    has_embeds: int
+    has_mentions: int
+    reply_to_message_id: str | None
+    created_at: str
+    edited_at: str | None
+    created_at_ms: int
@@ -1,90 +1,186 @@
 """Personality test logic, scoring, and Discord UI components."""
 
+import json
 import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from itertools import product
+from pathlib import Path
 from typing import Any
 
 import discord
 from discord.ui import Button, View
 import yaml
 
-from .models import Question, PersonalityProfile, UserSession, Scores
-from .database import save_test_result
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# numba/numpy are optional; only batch recomputation uses them
+try:
+    import numpy as np
+    from numba import njit
+
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+from .models import LETTERS, SCORE_LETTERS, Question, PersonalityProfile, UserSession, Scores
+from .database import queue_test_result
 
 logger = logging.getLogger(__name__)
 
 # Constants
 DIMENSIONS = ["EI", "SN", "TF", "JP"]
-DIMENSION_PAIRS = [("E", "I"), ("S", "N"), ("T", "F"), ("J", "P")]
+DIMENSION_INDEX_PAIRS = [(0, 1), (2, 3), (4, 5), (6, 7)]  # Score slots for E/I, S/N, T/F, J/P
 
+# All 16 types indexed by a 4-bit code: one bit per dimension (EI is the most
+# significant), set when the second letter wins. 0 -> "ESTJ", 15 -> "INFP".
+_MBTI_TYPES = tuple("".join(letters) for letters in product("EI", "SN", "TF", "JP"))
 
-def load_questions() -> list[Question]:
-    """Load questions from YAML file."""
-    with open("data/questions.yaml", "r") as f:
+
+def _load_yaml_cached(path: str) -> Any:
+    """
+    Load a YAML data file, reusing a JSON snapshot while the YAML is unchanged.
+
+    The snapshot is written next to the YAML file (e.g. data/questions.cache.json)
+    and keyed by the YAML file's mtime and size, so editing the YAML invalidates it.
+    """
+    source = Path(path)
+    cache_path = source.with_suffix(".cache.json")
+    stat = source.stat()
+    key = [stat.st_mtime_ns, stat.st_size]
+
+    try:
+        cached = _json_loads(cache_path.read_bytes())
+        if cached["key"] == key:
+            return cached["data"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # Missing, stale-format or corrupt cache - fall back to YAML
+
+    with open(source, "r") as f:
         data = yaml.safe_load(f)
-        return [Question.from_dict(q) for q in data["questions"]]
+
+    try:
+        cache_path.write_bytes(_json_dumps({"key": key, "data": data}))
+    except OSError as e:
+        logger.warning("Could not write cache %s: %s", cache_path, e)
+
+    return data
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize with orjson when installed, else the standard library."""
+    return orjson.dumps(obj) if orjson else json.dumps(obj).encode()
+
+
+def _json_loads(raw: bytes) -> Any:
+    """Deserialize with orjson when installed, else the standard library."""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def load_questions() -> list[Question]:
+    """Load questions from YAML file (via the JSON snapshot cache)."""
+    data = _load_yaml_cached("data/questions.yaml")
+    return [Question.from_dict(q) for q in data["questions"]]
 
 
 def load_profiles() -> dict[str, PersonalityProfile]:
-    """Load personality profiles from YAML file."""
-    with open("data/personality_profiles.yaml", "r") as f:
-        data = yaml.safe_load(f)
-        return {
-            personality_type: PersonalityProfile.from_dict(profile)
-            for personality_type, profile in data.items()
-        }
+    """Load personality profiles from YAML file (via the JSON snapshot cache)."""
+    data = _load_yaml_cached("data/personality_profiles.yaml")
+    return {
+        personality_type: PersonalityProfile.from_dict(profile)
+        for personality_type, profile in data.items()
+    }
 
 
 def get_dummy_questions(all_questions: list[Question]) -> list[Question]:
     """Get 5 sample questions for quick test - one from each dimension group."""
-    dummy = []
+    # Bucket questions by dimension in a single pass
+    buckets: defaultdict[str, list[Question]] = defaultdict(list)
+    for q in all_questions:
+        buckets[q.dimension].append(q)
+
     # Get first question from each dimension
-    for dimension in DIMENSIONS:
-        for q in all_questions:
-            if q.dimension == dimension and q not in dummy:
-                dummy.append(q)
-                break
+    dummy = [buckets[dimension][0] for dimension in DIMENSIONS if buckets[dimension]]
     # Add one more from EI
-    for q in all_questions:
-        if q.dimension == "EI" and q not in dummy:
-            dummy.append(q)
-            break
+    dummy.extend(buckets["EI"][1:2])
     return dummy[:5]
 
 
 def calculate_personality(scores: Scores) -> str:
     """Calculate MBTI personality type from scores."""
     personality = ""
-    for pos, neg in DIMENSION_PAIRS:
-        personality += pos if scores.get(pos, 0) > scores.get(neg, 0) else neg
+    for pos, neg in DIMENSION_INDEX_PAIRS:
+        personality += SCORE_LETTERS[pos] if scores[pos] > scores[neg] else SCORE_LETTERS[neg]
     return personality
 
 
+def _mbti_code(scores: Scores) -> int:
+    """Pack a score array into its 4-bit _MBTI_TYPES index."""
+    code = 0
+    for pos, neg in DIMENSION_INDEX_PAIRS:
+        code = (code << 1) | (scores[pos] <= scores[neg])
+    return code
+
+
+if _NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _calc_mbti_batch(scores):
+        """Compute the 4-bit _MBTI_TYPES index for each row of an (n, 8) score matrix."""
+        n = scores.shape[0]
+        codes = np.empty(n, dtype=np.int32)
+        for row in range(n):
+            code = 0
+            for dim in range(4):
+                code <<= 1
+                if scores[row, 2 * dim] <= scores[row, 2 * dim + 1]:
+                    code |= 1
+            codes[row] = code
+        return codes
+
+
+def calculate_personality_batch(score_rows: Iterable[Scores]) -> list[str]:
+    """
+    Calculate MBTI types for many score arrays at once, e.g. when recomputing
+    stored results after a weight change. Uses a numba kernel when available.
+    """
+    if _NUMBA_AVAILABLE:
+        matrix = np.asarray([list(row) for row in score_rows], dtype=np.int32).reshape(-1, 8)
+        return [_MBTI_TYPES[code] for code in _calc_mbti_batch(matrix)]
+    return [_MBTI_TYPES[_mbti_code(row)] for row in score_rows]
+
+
 def format_result_message(personality_type: str, profile: PersonalityProfile) -> str:
     """Format the result message with profile info."""
-    msg = "**Test Complete!**\n\n"
-    msg += f"**Your Personality Type: {personality_type}**\n\n"
-    msg += f"{profile.description}\n\n"
-
-    msg += "**Biblical Characters:**\n"
-    for char in profile.biblical_characters[:2]:  # Show first 2
-        msg += f"• {char}\n"
+    parts = [
+        "**Test Complete!**\n\n",
+        f"**Your Personality Type: {personality_type}**\n\n",
+        f"{profile.description}\n\n",
+        "**Biblical Characters:**\n",
+    ]
+    parts.extend(f"• {char}\n" for char in profile.biblical_characters[:2])  # Show first 2
 
-    msg += "\n**Your Spiritual Gifts:**\n"
-    for gift in profile.spiritual_gifts[:3]:  # Show first 3
-        msg += f"• {gift}\n"
+    parts.append("\n**Your Spiritual Gifts:**\n")
+    parts.extend(f"• {gift}\n" for gift in profile.spiritual_gifts[:3])  # Show first 3
 
-    msg += "\n**Ministry Suggestions:**\n"
-    for suggestion in profile.ministry_suggestions[:2]:  # Show first 2
-        msg += f"• {suggestion}\n"
+    parts.append("\n**Ministry Suggestions:**\n")
+    parts.extend(f"• {suggestion}\n" for suggestion in profile.ministry_suggestions[:2])
 
-    msg += "\n✅ Your results have been saved!\n"
-    msg += "\nType 'start test' for full test or 'start dummy test' for quick test!"
+    parts.append("\n✅ Your results have been saved!\n")
+    parts.append("\nType 'start test' for full test or 'start dummy test' for quick test!")
 
-    return msg
+    return "".join(parts)
 
 
 class QuestionView(View):
-    """View with buttons for answering questions."""
+    """View with buttons for answering questions.
+
+    A single view is kept for the whole test: after each answer it is rebound
+    to the next question and the same message is edited in place.
+    """
 
     def __init__(
         self,
@@ -105,73 +201,69 @@ class QuestionView(View):
         self.username = username
         self.user_sessions = user_sessions
 
-        # Add buttons for each option
-        for i, option in enumerate(question.options):
+        # Build one button per option slot up front; rebind() shows the ones in use
+        max_options = max(len(q.options) for q in questions)
+        self._buttons: list[Button] = []
+        for i in range(max_options):
             button = Button(
-                label=f"{chr(65+i)}",
+                label=LETTERS[i],
                 style=discord.ButtonStyle.primary,
-                custom_id=f"answer_{chr(65+i)}",
+                custom_id=f"answer_{LETTERS[i]}",
             )
-            button.callback = self._create_callback(i)
-            self.add_item(button)
+            button.callback = self._answer_callback
+            self._buttons.append(button)
 
-    def _create_callback(self, answer_idx: int):
-        """Create callback for button."""
+        self.rebind(question)
 
-        async def callback(interaction: discord.Interaction) -> None:
-            # Make sure the person clicking is the one who started the test
-            if interaction.user.id != self.user_id:
-                await interaction.response.send_message("This is not your test!", ephemeral=True)
-                return
+    def rebind(self, question: Question) -> None:
+        """Point the view at a new question, showing one enabled button per option."""
+        self.question = question
 
-            await self._handle_answer(interaction, answer_idx)
+        self.clear_items()
+        for button in self._buttons[: len(question.options)]:
+            button.disabled = False
+            self.add_item(button)
+
+    async def _answer_callback(self, interaction: discord.Interaction) -> None:
+        """Shared callback for all answer buttons; the option comes from the custom_id."""
+        # Make sure the person clicking is the one who started the test
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message("This is not your test!", ephemeral=True)
+            return
 
-        return callback
+        # custom_id is "answer_<letter>", e.g. "answer_B" -> option 1
+        answer_idx = ord(interaction.data["custom_id"].split("_")[1]) - 65
+        await self._handle_answer(interaction, answer_idx)
 
     async def _handle_answer(self, interaction: discord.Interaction, answer_idx: int) -> None:
         """Handle user's answer to current question."""
-        option = self.question.options[answer_idx]
-        weight = option.weight
-
-        # Record answer
-        self.session.answers.append(chr(65 + answer_idx))
+        record = self.question.option_records[answer_idx]
 
-        # Update scores based on dimension and weight
-        self._update_scores(weight)
+        # Record answer and add its weight to the score slot resolved at load time
+        self.session.answers.append(record.letter)
+        self.session.scores[record.score_idx] += record.abs_weight
 
         # Move to next question
         self.session.current_question += 1
 
-        # Disable all buttons
-        for item in self.children:
-            item.disabled = True
-        await interaction.response.edit_message(view=self)
-
         # Check if test is complete
         if self.session.current_question >= len(self.questions):
+            # Disable all buttons
+            for item in self.children:
+                item.disabled = True
+            await interaction.response.edit_message(view=self)
             await self._complete_test(interaction)
         else:
             await self._ask_next_question(interaction)
 
-    def _update_scores(self, weight: int) -> None:
-        """Update session scores based on question dimension and weight."""
-        dimension = self.question.dimension
-
-        if weight > 0:
-            # Positive weight goes to first letter (E, S, T, J)
-            self.session.scores[dimension[0]] += abs(weight)
-        else:
-            # Negative weight goes to second letter (I, N, F, P)
-            self.session.scores[dimension[1]] += abs(weight)
-
     async def _complete_test(self, interaction: discord.Interaction) -> None:
         """Calculate results and save to database."""
         personality = calculate_personality(self.session.scores)
         profile = self.profiles[personality]
 
-        # Save to database
+        # Queue the database write so the result is sent without waiting on it
         test_type = "dummy" if self.session.is_dummy else "full"
-        save_test_result(
+        queue_test_result(
             self.user_id, self.username, personality, test_type, self.session.scores, profile
         )
 
@@ -179,30 +271,17 @@ class QuestionView(View):
         await interaction.followup.send(result_msg)
 
         # Clean up session
-        if self.user_id in self.user_sessions:
-            del self.user_sessions[self.user_id]
+        self.user_sessions.pop(self.user_id, None)
 
-        logger.info(f"Test completed for {self.username}: {personality}")
+        logger.info("Test completed for %s: %s", self.username, personality)
 
     async def _ask_next_question(self, interaction: discord.Interaction) -> None:
-        """Send the next question to the user."""
+        """Edit the current message to show the next question."""
         next_q = self.questions[self.session.current_question]
-        options_text = "\n".join(
-            [f"{chr(65+i)}) {opt.text}" for i, opt in enumerate(next_q.options)]
-        )
-
-        view = QuestionView(
-            next_q,
-            self.session,
-            self.questions,
-            self.profiles,
-            self.user_id,
-            self.username,
-            self.user_sessions,
-        )
+        self.rebind(next_q)
 
-        await interaction.followup.send(
-            f"Question {self.session.current_question + 1}/{len(self.questions)}: "
-            f"{next_q.text}\n\n{options_text}",
-            view=view,
+        await interaction.response.edit_message(
+            content=f"Question {self.session.current_question + 1}/{len(self.questions)}: "
+            f"{next_q.text}\n\n{next_q.options_text}",
+            view=self,
         )
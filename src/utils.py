@@ -0,0 +1,16 @@
+"""Small shared helpers used across commands and analytics."""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def format_username(name: str, discriminator: str) -> str:
+    """
+    Format a Discord username for display and storage.
+
+    Users migrated to Discord's unique usernames have discriminator "0", so the
+    legacy "#0000" suffix is only added for accounts that still have one.
+    """
+    if discriminator in ("", "0"):
+        return name
+    return f"{name}#{discriminator}"
@@ -0,0 +1,121 @@
+"""Tests for the messages_hourly rollup maintained by the message flush."""
+
+import sys
+from pathlib import Path
+
+import libsql
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src import database  # noqa: E402
+from src.models import MessageRow  # noqa: E402
+
+
+def make_row(message_id: str, hour: str = "2025-01-01T10", length: int = 5) -> MessageRow:
+    """Build a message row in user 1's channel 10 during the given UTC hour."""
+    return MessageRow(
+        message_id=message_id,
+        discord_user_id="1",
+        discord_username="alice",
+        message_text="x" * length,
+        channel_id="10",
+        channel_name="general",
+        server_id="100",
+        server_name="Server",
+        is_dm=0,
+        message_length=length,
+        has_attachments=1,
+        has_embeds=0,
+        has_mentions=0,
+        reply_to_message_id=None,
+        created_at=f"{hour}:15:00+00:00",
+        edited_at=None,
+        created_at_ms=0,
+    )
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Point the database module at a temporary local file (production mode, no replica)."""
+    path = tmp_path / "bot.db"
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    monkeypatch.setenv("TURSO_DATABASE_URL", str(path))
+    monkeypatch.setenv("TURSO_AUTH_TOKEN", "test")
+    database._message_buffer.clear()
+    yield path
+    database._message_buffer.clear()
+
+
+def rollup(path: Path) -> list[tuple]:
+    """Read messages_hourly ordered by its primary key."""
+    conn = libsql.connect(str(path))
+    rows = conn.execute(
+        "SELECT discord_user_id, channel_id, hour, msg_count, total_length, attachment_count "
+        "FROM messages_hourly ORDER BY discord_user_id, channel_id, hour"
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def test_duplicate_message_id_not_counted(db_path):
+    """Rows skipped by INSERT OR IGNORE must not reach the rollup."""
+    database.init_database()
+    database.save_message(make_row("1"))
+    database.save_message(make_row("2"))
+    database.save_message(make_row("1"))  # Duplicate within the batch
+    assert database._flush_message_buffer() == []
+    database.close_database()
+
+    assert rollup(db_path) == [("1", "10", "2025-01-01T10", 2, 10, 2)]
+
+
+def test_consecutive_batches_accumulate(db_path):
+    """Each batch adds only its own inserts, including re-sent ids from earlier batches."""
+    database.init_database()
+    database.save_message(make_row("1"))
+    database.save_message(make_row("2", hour="2025-01-01T11", length=3))
+    assert database._flush_message_buffer() == []
+
+    database.save_message(make_row("2", hour="2025-01-01T11", length=3))  # Already stored
+    database.save_message(make_row("3"))
+    assert database._flush_message_buffer() == []
+    database.close_database()
+
+    assert rollup(db_path) == [
+        ("1", "10", "2025-01-01T10", 2, 10, 2),
+        ("1", "10", "2025-01-01T11", 1, 3, 1),
+    ]
+
+
+def test_backfill_existing_messages(db_path):
+    """A database upgraded with messages already stored gets them rolled up once."""
+    database.init_database()
+    database.close_database()
+
+    # Simulate a pre-rollup deployment: messages present, no messages_hourly table
+    conn = libsql.connect(str(db_path))
+    conn.execute("DROP TABLE messages_hourly")
+    conn.executemany(database._INSERT_MESSAGE_SQL, [make_row("1"), make_row("2")])
+    conn.execute(
+        "INSERT INTO messages (message_id, discord_user_id, discord_username, message_text, "
+        "channel_id, is_dm, message_length, has_attachments, has_embeds, has_mentions, "
+        "created_at) VALUES ('3', '1', 'alice', 'dm', NULL, 1, 2, 0, 0, 0, "
+        "'2025-01-01T10:30:00+00:00')"
+    )
+    conn.commit()
+    conn.close()
+
+    database.init_database()
+    database.close_database()
+    expected = [
+        ("1", "", "2025-01-01T10", 1, 2, 0),  # NULL channel_id buckets under ''
+        ("1", "10", "2025-01-01T10", 2, 10, 2),
+    ]
+    assert rollup(db_path) == expected
+
+    # The backfill only runs when the table is created, so a restart must not repeat it
+    database.init_database()
+    database.close_database()
+    assert rollup(db_path) == expected